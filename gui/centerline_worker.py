@@ -0,0 +1,32 @@
+from PySide6.QtCore import QObject, Signal
+from utils.stl_processor import stl_to_svg_wire
+
+class CenterlineWorker(QObject):
+    """
+    Converts an STL wire model to an SVG centerline off the GUI thread.
+    Move the worker to a QThread and connect the thread's started signal to run().
+    Signals:
+    progress (int): Completed percentage of the conversion.
+    finished (str): Path of the written SVG file.
+    failed (str): Error message if the conversion raised.
+    """
+    progress = Signal(int)
+    finished = Signal(str)
+    failed = Signal(str)
+
+    def __init__(self, stl_file, svg_file, scale=1.0, max_error=5.0, sample_size=1000):
+        super().__init__()
+        self.stl_file = stl_file
+        self.svg_file = svg_file
+        self.scale = scale
+        self.max_error = max_error
+        self.sample_size = sample_size
+
+    def run(self):
+        try:
+            stl_to_svg_wire(self.stl_file, self.svg_file, self.scale, self.max_error,
+                            self.sample_size, progress=self.progress.emit)
+        except Exception as e:
+            self.failed.emit(str(e))
+            return
+        self.finished.emit(self.svg_file)
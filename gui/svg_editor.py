@@ -1,5 +1,5 @@
 from PySide6.QtWidgets import QWidget
-from PySide6.QtCore import Qt
+from PySide6.QtCore import Qt, QTimer
 from wire_path_lib.path import PathCollection
 from wire_path_lib.input_handler import InputHandler
 from gui.ui_manager import UIManager
@@ -13,6 +13,7 @@ class SVGPathEditor(QWidget):
         self.path_collection = PathCollection()
         self.input_handler = InputHandler(self.path_collection)
         self.ui_manager = UIManager(self)
+        self._pending_rect = None
         
         self.setup_ui()
         self.setup_connections()
@@ -24,10 +25,10 @@ class SVGPathEditor(QWidget):
     def setup_connections(self):
         self.ui_manager.connect_buttons(self.input_handler)
         for path in self.path_collection.paths:
-            path.length_changed.connect(self.ui_manager.update_length_labels)
+            path.length_changed.connect(self.ui_manager.schedule_length_labels_update)
 
     def paintEvent(self, event):
-        self.ui_manager.paint_paths(self.path_collection.paths)
+        self.ui_manager.paint_paths(self.path_collection.paths, event)
 
     def mousePressEvent(self, event):
         if event.button() == Qt.LeftButton:
@@ -39,14 +40,34 @@ class SVGPathEditor(QWidget):
                     self.update()
             else:
                 if self.input_handler.start_dragging(event.position()):
+                    self.ui_manager.invalidate_static_pixmap()
                     self.update()
 
     def mouseMoveEvent(self, event):
+        old_rect = self.ui_manager.get_segments_rect(self.input_handler.get_dragging_segments())
         if self.input_handler.handle_dragging(event.position()):
-            self.update()
+            new_rect = self.ui_manager.get_segments_rect(self.input_handler.get_dragging_segments())
+            self.schedule_update(old_rect.united(new_rect))
+
+    def schedule_update(self, rect):
+        # Coalesce drag repaints to roughly one per display frame (~60 Hz)
+        if self._pending_rect is None:
+            self._pending_rect = rect
+            QTimer.singleShot(16, self._flush_update)
+        else:
+            self._pending_rect = self._pending_rect.united(rect)
+
+    def _flush_update(self):
+        self.update(self._pending_rect.toAlignedRect())
+        self._pending_rect = None
 
     def mouseReleaseEvent(self, event):
+        was_dragging = self.input_handler.get_dragging_path() is not None
         self.input_handler.stop_dragging()
+        if was_dragging:
+            self.ui_manager.invalidate_static_pixmap()
+            # Redraw in normal stacking order; during the drag the dragged path was painted on top
+            self.update()
 
     def update_cursor(self):
         if self.input_handler.add_mode:
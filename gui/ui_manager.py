@@ -1,14 +1,58 @@
 from PySide6.QtWidgets import (QVBoxLayout, QHBoxLayout, QPushButton, QLineEdit,
                                QLabel, QFileDialog, QWidget)
-from PySide6.QtGui import QPainter, QPen, QColor, QFont
-from PySide6.QtCore import Qt, QPointF
+from PySide6.QtGui import QPainter, QPen, QColor, QFont, QPixmap
+from PySide6.QtCore import Qt, QPointF, QRectF, QTimer, QThread, QObject, Slot
 import utils.svg_io as svg_io
+from gui.centerline_worker import CenterlineWorker
+from wire_path_lib.path import MARKER_RADIUS
+import os
+import tempfile
+
+# Outline width of the point markers drawn around segment points
+MARKER_PEN_WIDTH = 1
+# Largest radius and outline width of the add/snip overlays
+OVERLAY_MAX_SIZE = 10
+OVERLAY_PEN_WIDTH = 2
+# How far markers and overlays may paint beyond a segment's own bounds, plus a pixel for antialiasing
+MARKER_MARGIN = max(MARKER_RADIUS + MARKER_PEN_WIDTH / 2, OVERLAY_MAX_SIZE + OVERLAY_PEN_WIDTH / 2) + 1
+
+class _StlImportSlots(QObject):
+    """
+    Receives the STL worker's signals on the GUI thread and forwards them to the UIManager.
+
+    UIManager is not a QObject, so slots connected to its methods directly would run on
+    the worker thread. Connections to this object are queued to the thread it lives in.
+    """
+    def __init__(self, ui_manager, parent):
+        super().__init__(parent)
+        self.ui_manager = ui_manager
+
+    @Slot(int)
+    def update_progress(self, percent):
+        self.ui_manager.update_stl_progress(percent)
+
+    @Slot(str)
+    def on_converted(self, svg_path):
+        self.ui_manager.on_stl_converted(svg_path)
+
+    @Slot(str)
+    def on_failed(self, message):
+        self.ui_manager.on_stl_failed(message)
+
+    @Slot()
+    def on_thread_finished(self):
+        self.ui_manager.on_stl_thread_finished()
 
 class UIManager:
     def __init__(self, parent):
         self.parent = parent
         self.main_layout = QVBoxLayout()
         self.length_labels = []
+        self._lengths_dirty = False
+        self._static_pixmap = None
+        self._stl_thread = None
+        self._stl_worker = None
+        self._stl_slots = _StlImportSlots(self, parent)
         self.wire_diameter_inputs = []
         self.wire_diameter_layout = QVBoxLayout()
 
@@ -50,11 +94,13 @@ class UIManager:
         self.snip_button = QPushButton("Snip")
         self.save_button = QPushButton("Save SVG")
         self.import_button = QPushButton("Import SVG")
+        self.import_stl_button = QPushButton("Import STL")
         button_layout.addWidget(self.line_button)
         button_layout.addWidget(self.curve_button)
         button_layout.addWidget(self.snip_button)
         button_layout.addWidget(self.save_button)
         button_layout.addWidget(self.import_button)
+        button_layout.addWidget(self.import_stl_button)
         layout.addLayout(button_layout)
 
     def connect_buttons(self, input_handler):
@@ -63,7 +109,7 @@ class UIManager:
         self.snip_button.clicked.connect(self.toggle_snip_mode)
         self.save_button.clicked.connect(self.save_svg)
         self.import_button.clicked.connect(self.import_svg)
-        self.diameter_input.textChanged.connect(self.update_wire_diameter)
+        self.import_stl_button.clicked.connect(self.import_stl)
 
     def set_add_mode(self, input_handler, mode):
         input_handler.set_add_mode(mode)
@@ -77,88 +123,176 @@ class UIManager:
         self.parent.update_cursor()
         self.parent.update()
 
-    def update_wire_diameter(self, text):
-        new_diameter = float(text)
+    def update_wire_diameter(self, text, path_index=None):
+        try:
+            new_diameter = float(text)
+        except ValueError:
+            return  # Incomplete input such as "" or "-" while typing
+
+        paths = self.parent.path_collection.paths
+        affected = paths if path_index is None else paths[path_index:path_index + 1]
+        if all(path.wire_diameter == new_diameter for path in affected):
+            return  # e.g. "2." after "2", nothing to update
+
         if new_diameter > 0:
-            self.parent.path_collection.set_wire_diameter(new_diameter)
-            self.update_length_labels()  # Update length labels to reflect the new wire diameter
+            self.parent.path_collection.set_wire_diameter(new_diameter, path_index)
+            self._static_pixmap = None  # The cached paths may be drawn with the old diameter
+            self.schedule_length_labels_update()  # Update length labels to reflect the new wire diameter
         else:
             print("Wire diameter must be a positive number.")
         
     
     def update_wire_diameter_inputs(self):
-        # Clear existing inputs
-        for widget in self.wire_diameter_inputs:
-            self.wire_diameter_layout.removeWidget(widget)
-            widget.deleteLater()
-        self.wire_diameter_inputs.clear()
+        paths = self.parent.path_collection.paths
 
-        # Create new inputs for each path
-        for i, path in enumerate(self.parent.path_collection.paths):
+        # Create inputs only for paths that do not have one yet
+        while len(self.wire_diameter_inputs) < len(paths):
+            i = len(self.wire_diameter_inputs)
             diameter_layout = QHBoxLayout()
             diameter_label = QLabel(f"Path {i+1} Wire Diameter:")
             diameter_label.setStyleSheet("color: black;")
             diameter_layout.addWidget(diameter_label)
             
-            diameter_input = QLineEdit(str(path.wire_diameter))
+            diameter_input = QLineEdit()
             diameter_input.setMaximumWidth(50)
             diameter_input.setStyleSheet("color: black; background-color: white;")
-            diameter_input.textChanged.connect(lambda text, p=path: self.update_wire_diameter(p, text))
+            diameter_input.textChanged.connect(lambda text, i=i: self.update_wire_diameter(text, i))
             diameter_layout.addWidget(diameter_input)
             
             diameter_layout.addStretch()
             
             widget = QWidget()
             widget.setLayout(diameter_layout)
+            widget.diameter_input = diameter_input
             self.wire_diameter_layout.addWidget(widget)
             self.wire_diameter_inputs.append(widget)
-        # Clear existing 
 
+        # Remove inputs for paths that no longer exist
+        while len(self.wire_diameter_inputs) > len(paths):
+            widget = self.wire_diameter_inputs.pop()
+            self.wire_diameter_layout.removeWidget(widget)
+            widget.deleteLater()
+
+        for widget, path in zip(self.wire_diameter_inputs, paths):
+            # Showing the current value is not an edit, so don't feed it back to the path
+            widget.diameter_input.blockSignals(True)
+            widget.diameter_input.setText(str(path.wire_diameter))
+            widget.diameter_input.blockSignals(False)
+
+    def schedule_length_labels_update(self):
+        # Collapse every length change within one event loop turn into a single refresh
+        if not self._lengths_dirty:
+            self._lengths_dirty = True
+            QTimer.singleShot(0, self._flush_length_labels)
+
+    def _flush_length_labels(self):
+        self._lengths_dirty = False
+        self.update_length_labels()
 
     def update_length_labels(self):
-        for label in self.length_labels:
-            self.length_layout.removeWidget(label)
-            label.deleteLater()
-        self.length_labels.clear()
+        texts = [f"Path {i+1} Length: {path.calculate_length():.2f} units"
+                 for i, path in enumerate(self.parent.path_collection.paths)]
+        total_length = self.parent.path_collection.calculate_total_length()
+        texts.append(f"Total Length: {total_length:.2f} units")
 
-        for i, path in enumerate(self.parent.path_collection.paths):
-            length = path.calculate_length()
-            label = QLabel(f"Path {i+1} Length: {length:.2f} units")
+        # Keep one label per line of text, reusing the existing ones
+        while len(self.length_labels) < len(texts):
+            label = QLabel()
             label.setStyleSheet("color: black;")  # Ensure text is black
             self.length_layout.addWidget(label)
             self.length_labels.append(label)
+        while len(self.length_labels) > len(texts):
+            label = self.length_labels.pop()
+            self.length_layout.removeWidget(label)
+            label.deleteLater()
 
-        total_length = self.parent.path_collection.calculate_total_length()
-        total_label = QLabel(f"Total Length: {total_length:.2f} units")
-        total_label.setStyleSheet("color: black;")  # Ensure text is black
-        self.length_layout.addWidget(total_label)
-        self.length_labels.append(total_label)
+        for label, text in zip(self.length_labels, texts):
+            label.setText(text)
 
-    def paint_paths(self, paths):
+    def paint_paths(self, paths, event):
+        dirty_rect = event.rect()
         painter = QPainter(self.parent)
         painter.setRenderHint(QPainter.Antialiasing)
-        painter.fillRect(self.parent.rect(), Qt.white)
+        painter.setClipRect(dirty_rect)
 
+        dragging_path = self.parent.input_handler.get_dragging_path()
+        if dragging_path is None:
+            self._static_pixmap = None
+            painter.fillRect(dirty_rect, Qt.white)
+            self.draw_paths(painter, paths, QRectF(dirty_rect))
+        else:
+            # While dragging only one path changes; the others come from a cached image
+            static_paths = [path for path in paths if path is not dragging_path]
+            self.update_static_pixmap(static_paths)
+            painter.drawPixmap(QRectF(dirty_rect), self._static_pixmap, self._to_device_rect(dirty_rect))
+            self.draw_paths(painter, [dragging_path], QRectF(dirty_rect))
+
+        self.paint_add_points(painter)
+        self.paint_snip_points(painter)
+
+        painter.end()
+
+    def draw_paths(self, painter, paths, rect):
+        """
+        Draw the wire of the given paths and the markers on their points.
+        """
         for path in paths:
-            path.draw(painter)
+            path.draw(painter, rect)
 
         for path in paths:
-            for segment in path.segments:
-                painter.setPen(QPen(segment.color, 1))
-                painter.setBrush(segment.color.lighter(150))
-                painter.drawEllipse(segment.start_point, 5, 5)
-                painter.drawEllipse(segment.end_point, 5, 5)
-                if hasattr(segment, 'control_point'):
-                    painter.drawEllipse(segment.control_point, 5, 5)
+            for color, marker_path in path.get_marker_paths():
+                marker_rect = marker_path.controlPointRect().adjusted(-1, -1, 1, 1)
+                if not rect.intersects(marker_rect):
+                    continue
+                painter.setPen(QPen(color, MARKER_PEN_WIDTH))
+                painter.setBrush(color.lighter(150))
+                painter.drawPath(marker_path)
 
-        self.paint_add_points(painter)
-        self.paint_snip_points(painter)
+    def update_static_pixmap(self, static_paths):
+        """
+        Render the paths that are not being dragged into a pixmap, unless a pixmap
+        of the current widget size already exists for this drag.
+        """
+        ratio = self.parent.devicePixelRatioF()
+        size = self.parent.size() * ratio
+        if (self._static_pixmap is not None and self._static_pixmap.size() == size
+                and self._static_pixmap.devicePixelRatio() == ratio):
+            return
 
+        self._static_pixmap = QPixmap(size)
+        self._static_pixmap.setDevicePixelRatio(ratio)
+        self._static_pixmap.fill(Qt.white)
+        painter = QPainter(self._static_pixmap)
+        painter.setRenderHint(QPainter.Antialiasing)
+        self.draw_paths(painter, static_paths, QRectF(self.parent.rect()))
         painter.end()
 
+    def invalidate_static_pixmap(self):
+        """
+        Drop the cached image of the paths that are not being dragged, e.g. when a drag
+        starts or ends, so the next drag does not reuse one missing a different path.
+        """
+        self._static_pixmap = None
+
+    def _to_device_rect(self, rect):
+        ratio = self._static_pixmap.devicePixelRatio()
+        return QRectF(rect.x() * ratio, rect.y() * ratio, rect.width() * ratio, rect.height() * ratio)
+
+    def get_segments_rect(self, segments):
+        """
+        Get the area several segments and their point markers may paint into,
+        e.g. the segments affected by a drag.
+        """
+        wire_diameter = max((path.wire_diameter for path in self.parent.path_collection.paths), default=0)
+        margin = MARKER_MARGIN + wire_diameter / 2
+        rect = QRectF()
+        for segment in segments:
+            rect = rect.united(segment.bounding_rect().adjusted(-margin, -margin, margin, margin))
+        return rect
+
     def paint_add_points(self, painter):
         if self.parent.input_handler.add_mode:
-            painter.setPen(QPen(Qt.green, 2))
+            painter.setPen(QPen(Qt.green, OVERLAY_PEN_WIDTH))
             painter.setBrush(QColor(0, 255, 0, 100))
             for path in self.parent.path_collection.paths:
                 if path.segments:
@@ -170,7 +304,7 @@ class UIManager:
     
     def paint_add_point(self, painter, point):
         segment_length = self.get_segment_length(point)
-        size = min(10, max(5, segment_length / 10))
+        size = min(OVERLAY_MAX_SIZE, max(5, segment_length / 10))
         painter.drawEllipse(point, size, size)
         painter.drawLine(point + QPointF(-size/2, 0), point + QPointF(size/2, 0))
         painter.drawLine(point + QPointF(0, -size/2), point + QPointF(0, size/2))
@@ -178,13 +312,13 @@ class UIManager:
 
     def paint_snip_points(self, painter):
         if self.parent.input_handler.snip_mode:
-            painter.setPen(QPen(Qt.red, 2))
+            painter.setPen(QPen(Qt.red, OVERLAY_PEN_WIDTH))
             painter.setBrush(QColor(255, 0, 0, 100))
             for path in self.parent.path_collection.paths:
                 for segment in path.segments:
                     midpoint = segment.get_segment_midpoint()
                     segment_length = segment.calculate_length()
-                    size = min(10, max(5, segment_length / 10))
+                    size = min(OVERLAY_MAX_SIZE, max(5, segment_length / 10))
                     painter.drawEllipse(midpoint, size, size)
                     painter.drawLine(midpoint + QPointF(-size/2, -size/2), midpoint + QPointF(size/2, size/2))
                     painter.drawLine(midpoint + QPointF(-size/2, size/2), midpoint + QPointF(size/2, -size/2))
@@ -204,12 +338,56 @@ class UIManager:
     def import_svg(self):
         file_path, _ = QFileDialog.getOpenFileName(self.parent, "Import SVG", "", "SVG Files (*.svg)")
         if file_path:
-            imported_paths = svg_io.import_svg(file_path)
-            if imported_paths:
-                self.parent.path_collection.import_paths(imported_paths)
-                
-                # Update wire diameter inputs
-                self.update_wire_diameter_inputs()
-                
-                self.parent.update()
+            self.load_svg(file_path)
+
+    def load_svg(self, file_path):
+        imported_paths = svg_io.import_svg(file_path)
+        if imported_paths:
+            self.parent.path_collection.import_paths(imported_paths)
+            self._static_pixmap = None  # The cached image shows the replaced paths
+            
+            # Update wire diameter inputs
+            self.update_wire_diameter_inputs()
+            
+            self.parent.update()
+
+    def import_stl(self):
+        file_path, _ = QFileDialog.getOpenFileName(self.parent, "Import STL", "", "STL Files (*.stl)")
+        if not file_path or self._stl_thread is not None:
+            return
+
+        # The centerline extraction is slow, so run it on a worker thread and keep the UI responsive
+        fd, svg_path = tempfile.mkstemp(suffix=".svg")
+        os.close(fd)
+        self._stl_thread = QThread()
+        self._stl_worker = CenterlineWorker(file_path, svg_path)
+        self._stl_worker.moveToThread(self._stl_thread)
+        self._stl_thread.started.connect(self._stl_worker.run)
+        self._stl_worker.progress.connect(self._stl_slots.update_progress)
+        self._stl_worker.finished.connect(self._stl_slots.on_converted)
+        self._stl_worker.failed.connect(self._stl_slots.on_failed)
+        self._stl_thread.finished.connect(self._stl_slots.on_thread_finished)
+
+        self.import_stl_button.setEnabled(False)
+        self._stl_thread.start()
+
+    def update_stl_progress(self, percent):
+        self.import_stl_button.setText(f"Import STL ({percent}%)")
+
+    def on_stl_converted(self, svg_path):
+        self._stl_thread.quit()
+        self.load_svg(svg_path)
+        os.remove(svg_path)
+
+    def on_stl_failed(self, message):
+        self._stl_thread.quit()
+        os.remove(self._stl_worker.svg_file)
+        print(f"STL import failed: {message}")
 
+    def on_stl_thread_finished(self):
+        self._stl_worker.deleteLater()
+        self._stl_thread.deleteLater()
+        self._stl_worker = None
+        self._stl_thread = None
+        self.import_stl_button.setText("Import STL")
+        self.import_stl_button.setEnabled(True)
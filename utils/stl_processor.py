@@ -2,34 +2,40 @@ import numpy as np
 import trimesh
 import svgwrite
 from scipy.interpolate import splprep, splev
+from scipy.spatial import cKDTree
 import argparse
-from multiprocessing import Pool, cpu_count
+import hashlib
+from collections import OrderedDict
+
+# Most recent extract_centerline results, keyed by mesh contents and extraction settings
+_centerline_cache = OrderedDict()
+CENTERLINE_CACHE_SIZE = 8
 
 def closest_point_between_lines(p1, v1, p2, v2):
     n = np.cross(v1, v2)
     n1 = np.cross(v1, n)
     n2 = np.cross(v2, n)
-    
-    c1 = p1 + (np.dot(p2 - p1, n2) / np.dot(v1, n2)) * v1
-    c2 = p2 + (np.dot(p1 - p2, n1) / np.dot(v2, n1)) * v2
-    
-    return (c1 + c2) / 2, np.linalg.norm(c1 - c2)
-
-def process_chunk(args):
-    chunk, all_centroids, all_normals, max_distance = args
-    local_center_points = []
-    for i in chunk:
-        p1, v1 = all_centroids[i], all_normals[i]
-        for j in range(i + 1, len(all_centroids)):
-            p2, v2 = all_centroids[j], all_normals[j]
-            if np.linalg.norm(p1 - p2) > max_distance * 10:
-                continue
-            intersection_point, distance = closest_point_between_lines(p1, v1, p2, v2)
-            if distance < max_distance:
-                local_center_points.append(intersection_point)
-    return np.array(local_center_points)
-
-def extract_centerline(mesh, max_distance, sample_size=1000):
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        t1 = np.einsum('ij,ij->i', p2 - p1, n2) / np.einsum('ij,ij->i', v1, n2)
+        t2 = np.einsum('ij,ij->i', p1 - p2, n1) / np.einsum('ij,ij->i', v2, n1)
+
+    c1 = p1 + t1[:, None] * v1
+    c2 = p2 + t2[:, None] * v2
+
+    # Squared gap between the lines, so callers can compare without a sqrt per pair.
+    # Parallel lines have no unique closest point; never report them as close
+    gap = c1 - c2
+    parallel = np.einsum('ij,ij->i', n, n) < 1e-12
+    squared_distances = np.where(parallel, np.inf, np.einsum('ij,ij->i', gap, gap))
+
+    return (c1 + c2) / 2, squared_distances
+
+def _report(progress, percent):
+    if progress is not None:
+        progress(percent)
+
+def extract_centerline(mesh, max_distance, sample_size=1000, progress=None):
     facet_normals = mesh.face_normals
     facet_centroids = mesh.triangles_center
 
@@ -37,17 +43,25 @@ def extract_centerline(mesh, max_distance, sample_size=1000):
         indices = np.random.choice(len(facet_centroids), sample_size, replace=False)
         facet_normals = facet_normals[indices]
         facet_centroids = facet_centroids[indices]
+    _report(progress, 10)
 
-    num_processes = cpu_count()
-    chunk_size = len(facet_centroids) // num_processes
-    chunks = [range(i, min(i + chunk_size, len(facet_centroids))) for i in range(0, len(facet_centroids), chunk_size)]
-    
-    with Pool(num_processes) as pool:
-        results = pool.map(process_chunk, [(chunk, facet_centroids, facet_normals, max_distance) for chunk in chunks])
+    # Only facets within the search radius of each other are candidate pairs
+    tree = cKDTree(facet_centroids)
+    pairs = tree.query_pairs(max_distance * 10, output_type='ndarray')
+    i, j = pairs[:, 0], pairs[:, 1]
+    _report(progress, 30)
 
-    center_points = np.vstack(results)
+    intersection_points, squared_distances = closest_point_between_lines(
+        facet_centroids[i], facet_normals[i], facet_centroids[j], facet_normals[j])
+    center_points = intersection_points[squared_distances < max_distance ** 2]
+    _report(progress, 60)
 
-    center_points = np.unique(center_points.round(decimals=5), axis=0)
+    # Deduplicate with a hash of each row's bytes instead of sorting; the points are ordered
+    # along the principal axis below anyway. Adding 0.0 turns -0.0 into 0.0 so both hash alike
+    rounded = np.ascontiguousarray(center_points.round(decimals=5) + 0.0)
+    rows = rounded.view(np.dtype((np.void, rounded.dtype.itemsize * 3))).ravel()
+    unique_rows = dict.fromkeys(rows.tolist())
+    center_points = np.frombuffer(b"".join(unique_rows), dtype=rounded.dtype).reshape(-1, 3)
 
     pca = trimesh.transformations.principal_axes(center_points)
     projected = np.dot(center_points - np.mean(center_points, axis=0), pca[0])
@@ -57,9 +71,31 @@ def extract_centerline(mesh, max_distance, sample_size=1000):
     diffs = np.diff(center_points, axis=0)
     distances = np.linalg.norm(diffs, axis=1)
     wire_diameter = np.median(distances)
+    _report(progress, 80)
 
     return center_points, wire_diameter
 
+def extract_centerline_cached(mesh, max_distance, sample_size=1000, progress=None):
+    digest = hashlib.sha1(mesh.vertices.tobytes())
+    digest.update(mesh.faces.tobytes())
+    key = (digest.hexdigest(), max_distance, sample_size)
+
+    if key in _centerline_cache:
+        _centerline_cache.move_to_end(key)
+        _report(progress, 80)
+        return _centerline_cache[key]
+
+    center_points, wire_diameter = extract_centerline(mesh, max_distance, sample_size, progress)
+    # Cached points are shared between callers, so guard them against in-place edits
+    center_points.setflags(write=False)
+    _centerline_cache[key] = (center_points, wire_diameter)
+    if len(_centerline_cache) > CENTERLINE_CACHE_SIZE:
+        _centerline_cache.popitem(last=False)
+    return center_points, wire_diameter
+
+def clear_centerline_cache():
+    _centerline_cache.clear()
+
 def fit_bezier_spline(points, max_error, wire_diameter):
     normalized_error = max_error * wire_diameter / 100
     tck, u = splprep(points.T, s=normalized_error**2, k=3)
@@ -76,26 +112,31 @@ def create_svg(centerline, output_file, scale):
     
     dwg = svgwrite.Drawing(output_file, size=(f"{width+2*padding}mm", f"{height+2*padding}mm"))
     
-    scaled_points = [(scale * (x - min_x) + padding, scale * (y - min_y) + padding) for x, y, _ in centerline]
+    scaled_points = (centerline[:, :2] - np.array([min_x, min_y])) * scale + padding
     
     path = dwg.path(d=f"M{scaled_points[0][0]},{scaled_points[0][1]}", stroke="black", fill="none", stroke_width=0.5*scale)
     
-    for i in range(1, len(scaled_points), 3):
-        if i+2 < len(scaled_points):
-            path.push(f"C{scaled_points[i][0]},{scaled_points[i][1]} "
-                      f"{scaled_points[i+1][0]},{scaled_points[i+1][1]} "
-                      f"{scaled_points[i+2][0]},{scaled_points[i+2][1]}")
+    # Every following group of three points forms one cubic segment; a trailing partial group is dropped
+    num_curves = (len(scaled_points) - 1) // 3
+    triples = scaled_points[1:1 + 3 * num_curves].reshape(-1, 3, 2)
+    if num_curves:
+        path.push(" ".join(f"C{a[0]},{a[1]} {b[0]},{b[1]} {c[0]},{c[1]}" for a, b, c in triples))
     
     dwg.add(path)
     dwg.save()
 
-def stl_to_svg_wire(stl_file, svg_file, scale, max_error, sample_size):
+def stl_to_svg_wire(stl_file, svg_file, scale, max_error, sample_size, progress=None):
+    # progress, if given, is called with the completed percentage (0-100)
     mesh = trimesh.load_mesh(stl_file)
     max_distance = np.linalg.norm(mesh.bounding_box.extents) * 0.01
+    _report(progress, 0)
     
-    centerline, wire_diameter = extract_centerline(mesh, max_distance, sample_size)
+    # Re-running with only a different scale or error reuses the extracted centerline
+    centerline, wire_diameter = extract_centerline_cached(mesh, max_distance, sample_size, progress)
     smooth_centerline, num_bezier_curves = fit_bezier_spline(centerline, max_error, wire_diameter)
+    _report(progress, 90)
     create_svg(smooth_centerline, svg_file, scale)
+    _report(progress, 100)
     
     print(f"Wire diameter: {wire_diameter:.4f} units")
     print(f"Number of Bezier curves in the spline: {num_bezier_curves}")
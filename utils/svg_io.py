@@ -3,9 +3,25 @@ from wire_path_lib.path import Path
 from wire_path_lib.segments import Line, Curve
 from PySide6.QtCore import QPointF
 from PySide6.QtGui import QColor
+from functools import lru_cache
+import numpy as np
+import os
+
+@lru_cache(maxsize=16)
+def _parse_svg(abs_path, size, mtime):
+    # size and mtime are part of the cache key so an edited file is parsed again
+    return svg2paths(abs_path)
+
+def clear_parse_cache():
+    """
+    Drop all cached SVG parse results, e.g. to release memory.
+    """
+    _parse_svg.cache_clear()
 
 def import_svg(file_path):
-    paths, attributes = svg2paths(file_path)
+    stat = os.stat(file_path)
+    # The parsed svgpathtools objects are only read below, so cached results can be shared
+    paths, attributes = _parse_svg(os.path.abspath(file_path), stat.st_size, stat.st_mtime)
     
     imported_paths = []
     for svg_path, attr in zip(paths, attributes):
@@ -47,28 +63,36 @@ def import_svg(file_path):
     
     return imported_paths
 
+def _points_to_complex(points, count):
+    # Convert QPointFs to complex numbers through one float array instead of one complex() call each
+    coords = np.fromiter((c for point in points for c in (point.x(), point.y())), dtype=np.float64, count=2 * count)
+    return coords[0::2] + 1j * coords[1::2]
+
 def save_svg(file_path, paths):
     svg_paths = []
     attributes = []
     
     for path in paths:
-        svg_segments = []
-        for segment in path.segments:
-            start = complex(segment.start_point.x(), segment.start_point.y())
-            end = complex(segment.end_point.x(), segment.end_point.y())
-            
-            if isinstance(segment, Line):
-                svg_segments.append(SvgLine(start, end))
-            elif isinstance(segment, Curve):
-                control = complex(segment.control_point.x(), segment.control_point.y())
-                svg_segments.append(QuadraticBezier(start, control, end))
+        segments = path.segments
+        if not segments:
+            continue
+
+        starts = _points_to_complex((segment.start_point for segment in segments), len(segments))
+        ends = _points_to_complex((segment.end_point for segment in segments), len(segments))
+        # Lines have no control point; their entry is never used
+        controls = _points_to_complex((getattr(segment, 'control_point', segment.end_point) for segment in segments),
+                                      len(segments))
+
+        svg_segments = [QuadraticBezier(start, control, end) if isinstance(segment, Curve) else SvgLine(start, end)
+                        for segment, start, control, end in zip(segments, starts, controls, ends)
+                        if isinstance(segment, (Line, Curve))]
         
         svg_paths.append(SvgPath(*svg_segments))
         
         attributes.append({
-            'stroke': segment.color.name(),  # Use the color of the last segment
+            'stroke': segments[-1].color.name(),  # Use the color of the last segment
             'stroke-width': str(path.wire_diameter),
             'fill': 'none'
         })
     
-    wsvg(svg_paths, attributes=attributes, filename=file_path)
\ No newline at end of file
+    wsvg(svg_paths, attributes=attributes, filename=file_path)
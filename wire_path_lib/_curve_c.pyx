@@ -0,0 +1,40 @@
+# cython: language_level=3, boundscheck=False, wraparound=False, cdivision=True
+# distutils: extra_compile_args = -O3 -march=native -ffast-math
+"""
+Compiled version of _kernels.curve_length for installs without Numba.
+
+Build it in place with `cythonize -i wire_path_lib/_curve_c.pyx`.
+"""
+from libc.math cimport sqrt
+
+# 5-point Gauss-Legendre rule on [0, 1], must match GL_NODES/GL_WEIGHTS in _kernels
+cdef double GL_NODES[5]
+cdef double GL_WEIGHTS[5]
+GL_NODES[:] = [0.04691007703066802, 0.23076534494715845, 0.5, 0.7692346550528415, 0.9530899229693319]
+GL_WEIGHTS[:] = [0.11846344252809464, 0.23931433524968315, 0.28444444444444433, 0.23931433524968315, 0.11846344252809464]
+
+cdef inline double _integrate_speed(double ax, double ay, double bx, double by,
+                                    double t0, double t1) noexcept nogil:
+    cdef double h = t1 - t0
+    cdef double total = 0.0
+    cdef double t, dx, dy
+    cdef int i
+    for i in range(5):
+        t = t0 + h * GL_NODES[i]
+        dx = ax + bx * t
+        dy = ay + by * t
+        total += GL_WEIGHTS[i] * sqrt(dx * dx + dy * dy)
+    return total * h
+
+cpdef double curve_length(double sx, double sy, double cx, double cy, double ex, double ey) noexcept nogil:
+    cdef double ax = 2.0 * (cx - sx)
+    cdef double ay = 2.0 * (cy - sy)
+    cdef double bx = 2.0 * (ex - 2.0 * cx + sx)
+    cdef double by = 2.0 * (ey - 2.0 * cy + sy)
+    cdef double bb = bx * bx + by * by
+    cdef double t_min
+    if bb > 0.0:
+        t_min = -(ax * bx + ay * by) / bb
+        if 0.0 < t_min < 1.0:
+            return _integrate_speed(ax, ay, bx, by, 0.0, t_min) + _integrate_speed(ax, ay, bx, by, t_min, 1.0)
+    return _integrate_speed(ax, ay, bx, by, 0.0, 1.0)
@@ -0,0 +1,119 @@
+"""
+Numeric kernels for segment geometry that work on plain floats.
+
+They are compiled with Numba when it is installed. Without Numba the scalar curve
+kernel comes from the _curve_c Cython extension if it has been built, and the rest
+run as plain Python.
+"""
+import math
+import numpy as np
+
+try:
+    from numba import njit, guvectorize
+    HAVE_NUMBA = True
+except ImportError:  # Numba is optional
+    HAVE_NUMBA = False
+
+    def njit(*args, **kwargs):
+        def decorate(func):
+            return func
+        return decorate
+
+# 5-point Gauss-Legendre nodes and weights on [0, 1]
+_GL_NODES, _GL_WEIGHTS = np.polynomial.legendre.leggauss(5)
+GL_NODES = tuple(float(t) for t in (_GL_NODES + 1) / 2)
+GL_WEIGHTS = tuple(float(w) for w in _GL_WEIGHTS / 2)
+# The same rule as arrays for the batched NumPy path
+_GL_NODES_ARRAY = np.array(GL_NODES)
+_GL_WEIGHTS_ARRAY = np.array(GL_WEIGHTS)
+
+@njit(cache=True, fastmath=True)
+def _integrate_speed(ax, ay, bx, by, t0, t1):
+    # Gauss-Legendre integral of |(ax, ay) + (bx, by) * t| over [t0, t1]
+    h = t1 - t0
+    total = 0.0
+    for i in range(len(GL_NODES)):
+        t = t0 + h * GL_NODES[i]
+        dx = ax + bx * t
+        dy = ay + by * t
+        total += GL_WEIGHTS[i] * math.sqrt(dx * dx + dy * dy)
+    return total * h
+
+@njit(cache=True, fastmath=True)
+def curve_length(sx, sy, cx, cy, ex, ey):
+    """
+    Compute the length of a quadratic Bezier curve by integrating its speed
+    |B'(t)| = |a + b * t| with Gauss-Legendre quadrature.
+
+    The speed is the square root of a quadratic in t and has a kink where the curve
+    turns sharply, so the integral is split at the speed minimum when that lies
+    inside the curve.
+
+    Args:
+        sx, sy (float): The start point.
+        cx, cy (float): The control point.
+        ex, ey (float): The end point.
+
+    Returns:
+        float: The length of the curve.
+    """
+    ax = 2.0 * (cx - sx)
+    ay = 2.0 * (cy - sy)
+    bx = 2.0 * (ex - 2.0 * cx + sx)
+    by = 2.0 * (ey - 2.0 * cy + sy)
+    bb = bx * bx + by * by
+    if bb > 0.0:
+        t_min = -(ax * bx + ay * by) / bb
+        if 0.0 < t_min < 1.0:
+            return _integrate_speed(ax, ay, bx, by, 0.0, t_min) + _integrate_speed(ax, ay, bx, by, t_min, 1.0)
+    return _integrate_speed(ax, ay, bx, by, 0.0, 1.0)
+
+def line_lengths(lines):
+    """
+    Compute the lengths of many line segments at once.
+
+    Args:
+        lines (ndarray): (M, 4) array of [sx, sy, ex, ey] rows.
+
+    Returns:
+        ndarray: (M,) array of lengths.
+    """
+    return np.hypot(lines[:, 2] - lines[:, 0], lines[:, 3] - lines[:, 1])
+
+if not HAVE_NUMBA:
+    try:
+        from wire_path_lib._curve_c import curve_length
+    except ImportError:  # The extension is optional and built by hand
+        pass
+
+if HAVE_NUMBA:
+    @guvectorize(['void(float64[:], float64[:])'], '(n)->()', target='parallel', cache=True, fastmath=True)
+    def _curve_lengths_gufunc(curve, out):
+        out[0] = curve_length(curve[0], curve[1], curve[2], curve[3], curve[4], curve[5])
+
+def curve_lengths(curves):
+    """
+    Compute the lengths of many quadratic Bezier curves at once,
+    matching curve_length for each row.
+
+    Args:
+        curves (ndarray): (K, 6) array of [sx, sy, cx, cy, ex, ey] rows.
+
+    Returns:
+        ndarray: (K,) array of lengths.
+    """
+    if HAVE_NUMBA:
+        return _curve_lengths_gufunc(curves)
+    a = 2 * (curves[:, 2:4] - curves[:, 0:2])
+    b = 2 * (curves[:, 4:6] - 2 * curves[:, 2:4] + curves[:, 0:2])
+    bb = np.einsum('ij,ij->i', b, b)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        t_min = -np.einsum('ij,ij->i', a, b) / bb
+    # Always split; a speed minimum outside the curve leaves one empty half
+    t_min = np.clip(np.nan_to_num(t_min), 0.0, 1.0)[:, None]
+    length = np.zeros(len(curves))
+    for t0, t1 in ((0.0, t_min), (t_min, 1.0)):
+        t = t0 + (t1 - t0) * _GL_NODES_ARRAY
+        speeds = np.hypot(a[:, 0:1] + b[:, 0:1] * t, a[:, 1:2] + b[:, 1:2] * t)
+        length += (speeds @ _GL_WEIGHTS_ARRAY) * np.ravel(t1 - t0)
+    return length
@@ -1,5 +1,5 @@
 from PySide6.QtCore import QPointF
-from wire_path_lib.segments import Line, Curve
+from wire_path_lib.segments import Line, Curve, is_near
 import math
 from wire_path_lib.path import Path
 
@@ -15,7 +15,8 @@ class InputHandler:
     snip_mode (bool): Whether snip mode is active.
     add_points (list): Points where new segments can be added.
     dragging_segment (Segment): The segment currently being dragged.
-    dragging_point_type (str): The type of point being dragged.
+    dragging_path (Path): The path containing the segment being dragged.
+    dragging_point_type (PointType): The point being dragged.
     """
 
     def __init__(self, path_collection):
@@ -24,6 +25,7 @@ class InputHandler:
         self.snip_mode = False
         self.add_points = []
         self.dragging_segment = None
+        self.dragging_path = None
         self.dragging_point_type = None
 
     def set_add_mode(self, mode):
@@ -36,9 +38,8 @@ class InputHandler:
 
     def handle_snip(self, position):
         for path_index, path in enumerate(self.path_collection.paths):
-            for segment_index, segment in enumerate(path.segments):
-                midpoint = segment.get_segment_midpoint()
-                if (position - midpoint).manhattanLength() < 10:
+            for segment_index, segment in path.segments_near(position):
+                if is_near(position.x(), position.y(), segment.get_segment_midpoint()):
                     # Remove the segment
                     path.remove_segment(segment)
                     
@@ -53,10 +54,10 @@ class InputHandler:
                 if not path.segments:
                     self.add_segment(position, path)
                     return True
-                if (position - path.segments[0].start_point).manhattanLength() < 10:
+                if is_near(position.x(), position.y(), path.segments[0].start_point):
                     self.add_segment(path.segments[0].start_point, path, at_beginning=True)
                     return True
-                if (position - path.segments[-1].end_point).manhattanLength() < 10:
+                if is_near(position.x(), position.y(), path.segments[-1].end_point):
                     self.add_segment(path.segments[-1].end_point, path)
                     return True
             # If no existing path end points are clicked, create a new path
@@ -94,26 +95,44 @@ class InputHandler:
 
     def start_dragging(self, position):
         for path in self.path_collection.paths:
-            for segment in path.segments:
+            for _, segment in path.segments_near(position):
                 drag_type = segment.hit_test(position)
-                if drag_type:
+                if drag_type is not None:
                     self.dragging_segment = segment
+                    self.dragging_path = path
                     self.dragging_point_type = drag_type
                     return True
         return False
 
     def handle_dragging(self, position):
         if self.dragging_segment:
-            # Find the path that contains the dragging segment
-            for path in self.path_collection.paths:
-                if self.dragging_segment in path.segments:
-                    path.move_segment(self.dragging_segment, self.dragging_point_type, position)
-                    return True
+            self.dragging_path.move_segment(self.dragging_segment, self.dragging_point_type, position)
+            return True
         return False
 
+    def get_dragging_path(self):
+        """
+        Get the path containing the segment being dragged.
+        Returns:
+        Path: The path being edited, or None if nothing is being dragged.
+        """
+        return self.dragging_path
+
+    def get_dragging_segments(self):
+        """
+        Get the segments whose geometry changes while dragging.
+        Returns:
+        list: The dragged segment and its connected neighbours.
+        """
+        if not self.dragging_segment:
+            return []
+        segment = self.dragging_segment
+        return [s for s in (segment.prev, segment, segment.next) if s is not None]
+
     def stop_dragging(self):
         """
         Stop the current dragging action.
         """
         self.dragging_segment = None
+        self.dragging_path = None
         self.dragging_point_type = None
\ No newline at end of file
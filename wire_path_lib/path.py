@@ -1,7 +1,19 @@
-from PySide6.QtCore import QObject, Signal, QPointF
-from PySide6.QtGui import QColor
-from wire_path_lib.segments import Curve
-import random
+from PySide6.QtCore import QObject, Signal, QPointF, QRectF, Qt
+from PySide6.QtGui import QColor, QPainterPath, QPen
+from wire_path_lib.segments import Line, Curve, HIT_RADIUS
+from wire_path_lib._kernels import line_lengths, curve_lengths
+from collections import deque
+import numpy as np
+
+# Side length of the spatial grid cells used for hit testing; must be at least
+# twice the hit radius so a 3x3 neighbourhood of cells covers it
+GRID_CELL_SIZE = 2 * HIT_RADIUS
+
+# Smallest change in a path's length that is reported through length_changed
+LENGTH_CHANGE_EPSILON = 1e-9
+
+# Radius of the circles marking segment points in the editor
+MARKER_RADIUS = 5
 
 class Path(QObject):
     """
@@ -10,15 +22,22 @@ class Path(QObject):
     It provides methods for adding, removing, and manipulating segments, as well as
     calculating the path's total length and drawing the path.
     Attributes:
-    segments (list): A list of Segment objects that make up the path.
+    segments (deque): The Segment objects that make up the path, in order.
     wire_diameter (float): The diameter of the wire used in this path.
-    color_pool (list): A list of QColor objects used for coloring segments.
+    color_pool (list): A list of QColor objects used for coloring segments, handed out in turn.
     """
     length_changed = Signal()
 
     def __init__(self):
         super().__init__()
-        self.segments = []
+        self.segments = deque()  # Adding at either end is O(1)
+        self._length_cache = None
+        self._grid = None
+        self._bounds_cache = None
+        self._stroke_paths = None
+        self._marker_paths = None
+        self._pen_cache = {}  # (rgba, wire_diameter) -> QPen
+        self._last_emitted_length = 0.0  # Length at the last length_changed emission
         self.wire_diameter = 2.0  # Default wire diameter
         self.color_pool = [
             QColor(255, 0, 0), QColor(0, 255, 0), QColor(0, 0, 255),
@@ -26,6 +45,7 @@ class Path(QObject):
             QColor(128, 0, 0), QColor(0, 128, 0), QColor(0, 0, 128),
             QColor(128, 128, 0), QColor(128, 0, 128), QColor(0, 128, 128)
         ]
+        self._color_cursor = 0  # Index in color_pool of the next color to hand out
 
     def calculate_length(self):
         """
@@ -33,16 +53,154 @@ class Path(QObject):
         Returns:
         float: The sum of the lengths of all segments in the path.
         """
-        return sum(segment.calculate_length() for segment in self.segments)
+        if self._length_cache is None:
+            self._length_cache = self._compute_length()
+        return self._length_cache
+
+    def _compute_length(self):
+        """
+        Sum the segment lengths, measuring only the segments edited since they were last measured.
+        """
+        _measure_segments([segment for segment in self.segments if segment._length_cache is None])
+        return sum(segment._length_cache for segment in self.segments)
+
+    def _notify_length_changed(self):
+        """
+        Emit length_changed after an edit, unless the edit left the path's length as it was.
+        """
+        length = self.calculate_length()
+        if abs(length - self._last_emitted_length) > LENGTH_CHANGE_EPSILON:
+            self._last_emitted_length = length
+            self.length_changed.emit()
+
+    def _invalidate_caches(self):
+        """
+        Drop values derived from the segments after the path was edited.
+        """
+        self._length_cache = None
+        self._grid = None
+        self._bounds_cache = None
+        self._stroke_paths = None
+        self._marker_paths = None
 
-    def draw(self, painter):
+    def get_hit_bounds(self):
+        """
+        Get the area in which a point can hit any segment point of the path.
+        Returns:
+        QRectF: The segment bounds grown by the hit radius, or a null rectangle for an empty path.
+        """
+        if self._bounds_cache is None:
+            rect = QRectF()
+            for segment in self.segments:
+                rect = rect.united(segment.bounding_rect().adjusted(-HIT_RADIUS, -HIT_RADIUS, HIT_RADIUS, HIT_RADIUS))
+            self._bounds_cache = rect
+        return self._bounds_cache
+
+    def segments_near(self, point):
+        """
+        Get the segments with a start, control, end or mid point near the given point.
+        Args:
+        point (QPointF): The point to search around.
+        Returns:
+        list: (index, segment) tuples in path order for every candidate segment.
+        """
+        # Reject points away from the whole path before touching the grid
+        if not self.get_hit_bounds().contains(point):
+            return []
+        if self._grid is None:
+            self._grid = self._build_grid()
+        cell_x = int(point.x() // GRID_CELL_SIZE)
+        cell_y = int(point.y() // GRID_CELL_SIZE)
+        candidates = {}
+        for dx in (-1, 0, 1):
+            for dy in (-1, 0, 1):
+                for index, segment in self._grid.get((cell_x + dx, cell_y + dy), ()):
+                    candidates[index] = segment
+        return sorted(candidates.items(), key=lambda item: item[0])
+
+    def _build_grid(self):
+        """
+        Bucket the segments by the grid cells their points fall into.
+        Returns:
+        dict: Maps (cell_x, cell_y) to a list of (index, segment) tuples.
+        """
+        grid = {}
+        for index, segment in enumerate(self.segments):
+            points = (*segment.get_points(), segment.get_segment_midpoint())
+            cells = {(int(p.x() // GRID_CELL_SIZE), int(p.y() // GRID_CELL_SIZE)) for p in points}
+            for cell in cells:
+                grid.setdefault(cell, []).append((index, segment))
+        return grid
+
+    def draw(self, painter, rect=None):
         """
         Draw the entire path using the provided painter.
         Args:
         painter (QPainter): The painter object to use for drawing.
+        rect (QRectF, optional): If provided, skip anything whose stroke does not intersect it.
+        """
+        margin = self.wire_diameter / 2 + 1
+        painter.setBrush(Qt.NoBrush)
+        for color, painter_path in self.get_stroke_paths():
+            if rect is not None and not rect.intersects(
+                    painter_path.controlPointRect().adjusted(-margin, -margin, margin, margin)):
+                continue
+            painter.setPen(self.get_pen(color))
+            painter.drawPath(painter_path)
+
+    def get_pen(self, color):
+        """
+        Get the pen for stroking segments of a color at the current wire diameter.
+        Args:
+        color (QColor): The segment color.
+        Returns:
+        QPen: A round-capped pen, created once per color and diameter.
+        """
+        key = (color.rgba(), self.wire_diameter)
+        pen = self._pen_cache.get(key)
+        if pen is None:
+            pen = QPen(color, self.wire_diameter)
+            pen.setCapStyle(Qt.RoundCap)
+            pen.setJoinStyle(Qt.RoundJoin)
+            self._pen_cache[key] = pen
+        return pen
+
+    def get_stroke_paths(self):
+        """
+        Get the path geometry batched into one QPainterPath per segment color,
+        with consecutive segments of the same color joined into one subpath.
+        Returns:
+        list: (QColor, QPainterPath) tuples, rebuilt only after the path was edited.
         """
-        for segment in self.segments:
-            segment.draw(painter, self.wire_diameter)
+        if self._stroke_paths is None:
+            groups = {}
+            last_rgba = None
+            for segment in self.segments:
+                rgba = segment.color.rgba()
+                color, painter_path = groups.setdefault(rgba, (segment.color, QPainterPath()))
+                # A run of same-colored segments is stroked as one continuous subpath
+                segment.add_to_path(painter_path, connected=rgba == last_rgba)
+                last_rgba = rgba
+            self._stroke_paths = list(groups.values())
+        return self._stroke_paths
+
+    def get_marker_paths(self):
+        """
+        Get circles around every segment point, batched into one QPainterPath per segment color.
+        Returns:
+        list: (QColor, QPainterPath) tuples, rebuilt only after the path was edited.
+        """
+        if self._marker_paths is None:
+            groups = {}
+            for segment in self.segments:
+                color, painter_path = groups.setdefault(segment.color.rgba(), (segment.color, QPainterPath()))
+                for point in segment.get_points():
+                    painter_path.addEllipse(point, MARKER_RADIUS, MARKER_RADIUS)
+            for _, painter_path in groups.values():
+                # Circles of connected segments coincide; keep them filled instead of cancelling out
+                painter_path.setFillRule(Qt.WindingFill)
+            self._marker_paths = list(groups.values())
+        return self._marker_paths
 
     def add_segment(self, new_segment, at_beginning=False):
         """
@@ -52,39 +210,50 @@ class Path(QObject):
         at_beginning (bool): If True, add the segment at the start of the path.
         If False, add it at the end.
         """
-        new_segment.color = self.get_unique_color()
+        new_segment.color = self.get_unique_color(at_beginning)
         
         if at_beginning:
             if self.segments:
                 new_segment.connect_to(self.segments[0], is_next=True)
-            self.segments.insert(0, new_segment)
+            self.segments.appendleft(new_segment)
         else:
             if self.segments:
                 self.segments[-1].connect_to(new_segment, is_next=True)
             self.segments.append(new_segment)
         
-        self.length_changed.emit()
+        self._invalidate_caches()
+        self._notify_length_changed()
 
-    def get_unique_color(self):
+    def get_unique_color(self, at_beginning=False):
         """
-        Get a unique color for a new segment.
+        Get a unique color for a new segment, taking the pool colors in turn and
+        skipping one that matches the adjacent segment.
+        Args:
+        at_beginning (bool): If True, the segment will be added before the first segment,
+        otherwise after the last one.
         Returns:
         QColor: A color that is not currently used by adjacent segments.
         """
-        used_colors = [segment.color for segment in self.segments]
-        available_colors = [c for c in self.color_pool if c not in used_colors]
-        return random.choice(available_colors) if available_colors else random.choice(self.color_pool)
+        color = self.color_pool[self._color_cursor]
+        self._color_cursor = (self._color_cursor + 1) % len(self.color_pool)
+        if self.segments and len(self.color_pool) > 1:
+            neighbour = self.segments[0] if at_beginning else self.segments[-1]
+            if neighbour.color is not None and neighbour.color.rgba() == color.rgba():
+                color = self.color_pool[self._color_cursor]
+                self._color_cursor = (self._color_cursor + 1) % len(self.color_pool)
+        return color
 
     def move_segment(self, segment, point_type, new_pos):
         """
         Move a point in the specified segment.
         Args:
         segment (Segment): The segment containing the point to move.
-        point_type (str): The type of point to move ('start', 'end', or 'control').
+        point_type (PointType): The point to move.
         new_pos (QPointF): The new position for the point.
         """
         segment.move_point(point_type, new_pos)
-        self.length_changed.emit()
+        self._invalidate_caches()
+        self._notify_length_changed()
 
     def remove_segment(self, segment):
         """
@@ -92,48 +261,50 @@ class Path(QObject):
         Args:
         segment (Segment): The segment to be removed.
         """
-        if segment in self.segments:
-            self.segments.remove(segment)
+        try:
+            self.segments.remove(segment)  # A single scan, instead of a membership test and then remove
+        except ValueError:
+            pass
+        else:
             segment.disconnect()
-        self.length_changed.emit()
+            self._invalidate_caches()
+        self._notify_length_changed()
 
     def split(self, segment_index):
         new_path = Path()
         new_path.wire_diameter = self.wire_diameter
 
-        # Split the segments
-        new_path.segments = self.segments[segment_index + 1:]
-        self.segments = self.segments[:segment_index + 1]
+        # Move the segments after the split point over, popping them off this path's end.
+        # The index keeps slice semantics, so -1 moves every segment to the new path.
+        _, keep, _ = slice(segment_index + 1).indices(len(self.segments))
+        for _ in range(len(self.segments) - keep):
+            new_path.segments.appendleft(self.segments.pop())
+
+        first_segment = new_path.segments[0] if new_path.segments else None
 
         # Disconnect the segments at the split point
-        if self.segments and new_path.segments:
+        if self.segments and first_segment:
             last_segment = self.segments[-1]
-            first_segment = new_path.segments[0]
             
             # Ensure all points are properly set for both paths
             if isinstance(last_segment, Curve):
                 last_segment.end_point = last_segment.control_point
             if isinstance(first_segment, Curve):
                 first_segment.start_point = first_segment.control_point
-                first_segment.control_point = QPointF(
-                    (first_segment.start_point.x() + first_segment.end_point.x()) / 2,
-                    (first_segment.start_point.y() + first_segment.end_point.y()) / 2
-                )
             
             last_segment.next = None
             first_segment.prev = None
 
-        # Ensure all segments in the new path have their points set correctly
-        for i, segment in enumerate(new_path.segments):
-            if i > 0:
-                segment.start_point = new_path.segments[i-1].end_point
-            if isinstance(segment, Curve):
-                if i == 0:  # First segment
-                    segment.control_point = QPointF(
-                        (segment.start_point.x() + segment.end_point.x()) / 2,
-                        (segment.start_point.y() + segment.end_point.y()) / 2
-                    )
+        # A curve starting the new path gets its control point reset to the chord midpoint,
+        # also when this path is left empty
+        if isinstance(first_segment, Curve):
+            first_segment.control_point = QPointF(
+                (first_segment.start_point.x() + first_segment.end_point.x()) / 2,
+                (first_segment.start_point.y() + first_segment.end_point.y()) / 2
+            )
 
+        # Only the boundary segments changed; the rest of the new path is still connected
+        self._invalidate_caches()
         return new_path
 
     def set_wire_diameter(self, diameter):
@@ -143,7 +314,28 @@ class Path(QObject):
         diameter (float): The new wire diameter.
         """
         self.wire_diameter = diameter
-        self.length_changed.emit()
+        self._pen_cache.clear()  # Pens for the old diameter are no longer used
+        self._notify_length_changed()
+
+def _measure_segments(segments):
+    """
+    Compute and cache the lengths of segments with one vectorized kernel call per segment type.
+    Args:
+    segments (list): The segments to measure.
+    """
+    lines = [segment for segment in segments if isinstance(segment, Line)]
+    if lines:
+        line_xy = np.array([(s.start_point.x(), s.start_point.y(), s.end_point.x(), s.end_point.y())
+                            for s in lines], dtype=np.float64)
+        for segment, length in zip(lines, line_lengths(line_xy).tolist()):
+            segment._length_cache = length
+
+    curves = [segment for segment in segments if isinstance(segment, Curve)]
+    if curves:
+        curve_xy = np.array([(s.start_point.x(), s.start_point.y(), s.control_point.x(), s.control_point.y(),
+                              s.end_point.x(), s.end_point.y()) for s in curves], dtype=np.float64)
+        for segment, length in zip(curves, curve_lengths(curve_xy).tolist()):
+            segment._length_cache = length
 
 class PathCollection(QObject):
     """
@@ -183,7 +375,14 @@ class PathCollection(QObject):
         Returns:
         float: The sum of the lengths of all paths.
         """
-        return sum(path.calculate_length() for path in self.paths)
+        # Measure the edited segments of all edited paths in one kernel call per segment type,
+        # then fill in those paths' totals directly from the segment caches
+        stale_paths = [path for path in self.paths if path._length_cache is None]
+        _measure_segments([segment for path in stale_paths
+                           for segment in path.segments if segment._length_cache is None])
+        for path in stale_paths:
+            path._length_cache = sum(segment._length_cache for segment in path.segments)
+        return sum(path._length_cache for path in self.paths)
 
     def import_paths(self, imported_paths):
         """
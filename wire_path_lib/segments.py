@@ -1,8 +1,40 @@
-from PySide6.QtCore import QPointF
-from PySide6.QtGui import QPainterPath, QPen
-from PySide6.QtCore import Qt
+from PySide6.QtCore import QPointF, QRectF
+from PySide6.QtGui import QPolygonF
+from wire_path_lib._kernels import curve_length
+from enum import IntEnum
 import math
 
+# Distance from a point within which clicks hit it, for dragging, snipping and adding alike
+HIT_RADIUS = 10
+HIT_RADIUS_SQUARED = HIT_RADIUS * HIT_RADIUS
+
+def is_near(px, py, point):
+    """
+    Test whether a click position is within HIT_RADIUS of a point.
+
+    Args:
+        px, py (float): The click position.
+        point (QPointF): The point to test against.
+
+    Returns:
+        bool: True if the click hits the point.
+    """
+    # Plain float arithmetic avoids a temporary QPointF and a call into Qt per test
+    dx = px - point.x()
+    dy = py - point.y()
+    return dx * dx + dy * dy < HIT_RADIUS_SQUARED
+
+class PointType(IntEnum):
+    """
+    Identifies a point of a segment for hit testing and moving.
+    """
+    START = 0
+    CONTROL = 1
+    END = 2
+
+# Indexed by PointType: the neighbour sharing the point and the attribute to keep in sync on it
+_NEIGHBOUR_LINKS = (('prev', 'end_point'), None, ('next', 'start_point'))
+
 class Segment:
     """
     Base class for wire segments.
@@ -17,6 +49,12 @@ class Segment:
         next (Segment): The next segment in the wire path.
         color (QColor): The color of the segment.
     """
+    __slots__ = ('_start_point', '_end_point', 'prev', 'next', 'color',
+                 '_length_cache', '_bounds_cache', '_midpoint_cache')
+
+    # Indexed by PointType: the attribute holding each point, None where the segment has no such point
+    _POINT_ATTRS = (None, None, None)
+
     def __init__(self, start_point, end_point):
         """
         Initialize a new Segment.
@@ -25,12 +63,61 @@ class Segment:
             start_point (QPointF): The starting point of the segment.
             end_point (QPointF): The ending point of the segment.
         """
+        self._length_cache = None
+        self._bounds_cache = None
+        self._midpoint_cache = None
         self.start_point = start_point
         self.end_point = end_point
         self.prev = None
         self.next = None
         self.color = None
 
+    @property
+    def start_point(self):
+        return self._start_point
+
+    @start_point.setter
+    def start_point(self, point):
+        self._start_point = point
+        self._invalidate_caches()
+
+    @property
+    def end_point(self):
+        return self._end_point
+
+    @end_point.setter
+    def end_point(self, point):
+        self._end_point = point
+        self._invalidate_caches()
+
+    def _invalidate_caches(self):
+        """
+        Drop values derived from the segment geometry after one of its points changed.
+        """
+        self._length_cache = None
+        self._bounds_cache = None
+        self._midpoint_cache = None
+
+    def bounding_rect(self):
+        """
+        Returns the axis-aligned bounding rectangle of the segment's points.
+
+        For curves this includes the control point, which makes it a conservative
+        bound of the drawn curve.
+        """
+        if self._bounds_cache is None:
+            points = self.get_points()
+            xs = [point.x() for point in points]
+            ys = [point.y() for point in points]
+            self._bounds_cache = QRectF(min(xs), min(ys), max(xs) - min(xs), max(ys) - min(ys))
+        return self._bounds_cache
+
+    def get_points(self):
+        """
+        Returns the points defining the segment.
+        """
+        return (self.start_point, self.end_point)
+
     def connect_to(self, other_segment, is_next=True):
         """
         Connect this segment to another segment.
@@ -60,18 +147,49 @@ class Segment:
             self.next = None
 
     def calculate_length(self):
+        """
+        Returns the length of the segment, computing it only after the geometry changed.
+        """
+        if self._length_cache is None:
+            self._length_cache = self._compute_length()
+        return self._length_cache
+
+    def _compute_length(self):
         raise NotImplementedError("Subclass must implement abstract method")
 
-    def draw(self, painter, wire_diameter):
+    def add_to_path(self, painter_path, connected=False):
         raise NotImplementedError("Subclass must implement abstract method")
 
     def hit_test(self, point):
         raise NotImplementedError("Subclass must implement abstract method")
 
     def move_point(self, point_type, new_pos):
-        raise NotImplementedError("Subclass must implement abstract method")
+        """
+        Move a point of the segment, keeping the neighbouring segment connected.
+
+        Args:
+            point_type (PointType): The point to move.
+            new_pos (QPointF): The new position for the point.
+        """
+        attr = self._POINT_ATTRS[point_type]
+        if attr is None:
+            return
+        setattr(self, attr, new_pos)
+        link = _NEIGHBOUR_LINKS[point_type]
+        if link is not None:
+            neighbour = getattr(self, link[0])
+            if neighbour:
+                setattr(neighbour, link[1], new_pos)
     
     def get_segment_midpoint(self):
+        """
+        Returns the midpoint of the segment, computing it only after the geometry changed.
+        """
+        if self._midpoint_cache is None:
+            self._midpoint_cache = self._compute_midpoint()
+        return self._midpoint_cache
+
+    def _compute_midpoint(self):
         raise NotImplementedError("Subclass must implement abstract method")
 
 class Line(Segment):
@@ -79,20 +197,24 @@ class Line(Segment):
     Represents a straight line segment in the wire path.
 
     This class inherits from Segment and implements the methods
-    for drawing, hit testing, and moving points specific to a line.
+    for path building, hit testing, and moving points specific to a line.
     """
-    def draw(self, painter, wire_diameter):
+    __slots__ = ()
+
+    _POINT_ATTRS = ('start_point', None, 'end_point')
+
+    def add_to_path(self, painter_path, connected=False):
         """
-        Draw the line segment on a QPainter.
+        Add the line segment to a QPainterPath.
 
         Args:
-            painter (QPainter): The painter to draw on.
-            wire_diameter (float): The diameter of the wire.
+            painter_path (QPainterPath): The path to extend.
+            connected (bool): If True, the path's current position is already the start point
+                              and the line continues the current subpath.
         """
-        pen = QPen(self.color, wire_diameter)
-        pen.setCapStyle(Qt.RoundCap)
-        painter.setPen(pen)
-        painter.drawLine(self.start_point, self.end_point)
+        if not connected:
+            painter_path.moveTo(self.start_point)
+        painter_path.lineTo(self.end_point)
 
     def hit_test(self, point):
         """
@@ -102,57 +224,49 @@ class Line(Segment):
             point (QPointF): The point to test.
 
         Returns:
-            str or None: 'start' if near the start point, 'end' if near the end point, or None if not near.
+            PointType or None: START if near the start point, END if near the end point, or None if not near.
         """
-        if (point - self.start_point).manhattanLength() < 10:
-            return 'start'
-        if (point - self.end_point).manhattanLength() < 10:
-            return 'end'
+        px, py = point.x(), point.y()
+        if is_near(px, py, self.start_point):
+            return PointType.START
+        if is_near(px, py, self.end_point):
+            return PointType.END
         return None
 
-    def move_point(self, point_type, new_pos):
-        """
-        Move a point of the line segment.
-
-        Args:
-            point_type (str): The type of point to move ('start' or 'end').
-            new_pos (QPointF): The new position for the point.
-        """
-        if point_type == 'start':
-            self.start_point = new_pos
-            if self.prev:
-                self.prev.end_point = new_pos
-        elif point_type == 'end':
-            self.end_point = new_pos
-            if self.next:
-                self.next.start_point = new_pos
-    
-    def calculate_length(self):
+    def _compute_length(self):
         """
         Returns the length of the line segment.
         """
-        return math.sqrt((self.end_point.x() - self.start_point.x())**2 + 
-                         (self.end_point.y() - self.start_point.y())**2)
+        start, end = self.start_point, self.end_point
+        return math.hypot(end.x() - start.x(), end.y() - start.y())
     
-    def get_segment_midpoint(self):
+    def _compute_midpoint(self):
         """
         Calculate the midpoint of the line segment.
 
         Returns:
             QPointF: The midpoint of the line segment.
         """
-        return (self.start_point + self.end_point) / 2
+        start, end = self.start_point, self.end_point
+        return QPointF((start.x() + end.x()) / 2, (start.y() + end.y()) / 2)
 
 class Curve(Segment):
     """
     Represents a curved segment in the wire path.
 
     This class inherits from Segment and implements the methods
-    for drawing, hit testing, and moving points specific to a quadratic Bezier curve.
+    for path building, hit testing, and moving points specific to a quadratic Bezier curve.
 
     Attributes:
         control_point (QPointF): The control point of the quadratic Bezier curve.
     """
+    __slots__ = ('_control_point', '_polyline_cache')
+
+    _POINT_ATTRS = ('start_point', 'control_point', 'end_point')
+
+    # Number of line pieces used to flatten the curve for drawing
+    POLYLINE_STEPS = 32
+
     def __init__(self, start_point, control_point, end_point):
         """
         Initialize a new Curve segment.
@@ -165,40 +279,68 @@ class Curve(Segment):
         super().__init__(start_point, end_point)
         self.control_point = control_point
 
-    def draw(self, painter, wire_diameter):
+    @property
+    def control_point(self):
+        return self._control_point
+
+    @control_point.setter
+    def control_point(self, point):
+        self._control_point = point
+        self._invalidate_caches()
+
+    def _invalidate_caches(self):
+        super()._invalidate_caches()
+        self._polyline_cache = None
+
+    def get_points(self):
         """
-        Draw the curve segment on a QPainter.
+        Returns the points defining the curve, including the control point.
+        """
+        return (self.start_point, self.control_point, self.end_point)
+
+    def get_polyline(self):
+        """
+        Returns the curve flattened into line pieces, computing it only after the geometry changed.
+
+        Returns:
+            QPolygonF: POLYLINE_STEPS + 1 points along the curve.
+        """
+        if self._polyline_cache is None:
+            # Same formula as bezier_point, with the coordinates read once for all samples
+            start, control, end = self.start_point, self.control_point, self.end_point
+            sx, sy, cx, cy, ex, ey = start.x(), start.y(), control.x(), control.y(), end.x(), end.y()
+            points = []
+            for i in range(self.POLYLINE_STEPS + 1):
+                t = i / self.POLYLINE_STEPS
+                u = 1 - t
+                a, b, c = u * u, 2 * u * t, t * t
+                points.append(QPointF(a * sx + b * cx + c * ex, a * sy + b * cy + c * ey))
+            self._polyline_cache = QPolygonF(points)
+        return self._polyline_cache
+
+    def add_to_path(self, painter_path, connected=False):
+        """
+        Add the flattened curve as a new subpath of a QPainterPath.
 
         Args:
-            painter (QPainter): The painter to draw on.
-            wire_diameter (float): The diameter of the wire.
+            painter_path (QPainterPath): The path to extend.
+            connected (bool): Unused; adding the polyline in one call is cheaper than
+                              continuing the current subpath point by point.
         """
-        pen = QPen(self.color, wire_diameter)
-        pen.setCapStyle(Qt.RoundCap)
-        painter.setPen(pen)
-        path = QPainterPath()
-        path.moveTo(self.start_point)
-        path.quadTo(self.control_point, self.end_point)
-        painter.drawPath(path)
+        painter_path.addPolygon(self.get_polyline())
 
-    def calculate_length(self):
+    def _compute_length(self):
         """
-        Calculate the approximate length of the curve.
+        Calculate the length of the curve.
 
-        This method uses a series of line segments to approximate the curve's length.
+        This method integrates the curve's speed |B'(t)| with Gauss-Legendre quadrature
+        (see _kernels.curve_length).
 
         Returns:
-            float: The approximate length of the curve.
-        """
-        steps = 20
-        length = 0
-        last_point = self.start_point
-        for i in range(1, steps + 1):
-            t = i / steps
-            point = self.bezier_point(t)
-            length += math.sqrt((point.x() - last_point.x())**2 + (point.y() - last_point.y())**2)
-            last_point = point
-        return length
+            float: The length of the curve.
+        """
+        start, control, end = self.start_point, self.control_point, self.end_point
+        return curve_length(start.x(), start.y(), control.x(), control.y(), end.x(), end.y())
 
     def hit_test(self, point):
         """
@@ -208,35 +350,17 @@ class Curve(Segment):
             point (QPointF): The point to test.
 
         Returns:
-            str or None: 'start' if near the start point, 'control' if near the control point,
-                         'end' if near the end point, or None if not near any point.
-        """
-        if (point - self.start_point).manhattanLength() < 10:
-            return 'start'
-        if (point - self.control_point).manhattanLength() < 10:
-            return 'control'
-        if (point - self.end_point).manhattanLength() < 10:
-            return 'end'
-        return None
-
-    def move_point(self, point_type, new_pos):
+            PointType or None: START if near the start point, CONTROL if near the control point,
+                               END if near the end point, or None if not near any point.
         """
-        Move a point of the curve segment.
-
-        Args:
-            point_type (str): The type of point to move ('start', 'control', or 'end').
-            new_pos (QPointF): The new position for the point.
-        """
-        if point_type == 'start':
-            self.start_point = new_pos
-            if self.prev:
-                self.prev.end_point = new_pos
-        elif point_type == 'control':
-            self.control_point = new_pos
-        elif point_type == 'end':
-            self.end_point = new_pos
-            if self.next:
-                self.next.start_point = new_pos
+        px, py = point.x(), point.y()
+        if is_near(px, py, self.start_point):
+            return PointType.START
+        if is_near(px, py, self.control_point):
+            return PointType.CONTROL
+        if is_near(px, py, self.end_point):
+            return PointType.END
+        return None
 
     def bezier_point(self, t):
         """
@@ -248,13 +372,19 @@ class Curve(Segment):
         Returns:
             QPointF: A point on the curve corresponding to the given t value.
         """
-        return (1-t)**2 * self.start_point + 2*(1-t)*t * self.control_point + t**2 * self.end_point
+        u = 1 - t
+        a, b, c = u * u, 2 * u * t, t * t
+        start, control, end = self.start_point, self.control_point, self.end_point
+        return QPointF(a * start.x() + b * control.x() + c * end.x(),
+                       a * start.y() + b * control.y() + c * end.y())
     
-    def get_segment_midpoint(self):
+    def _compute_midpoint(self):
         """
         Calculate the approximate midpoint of the curve segment.
 
         Returns:
             QPointF: The approximate midpoint of the curve segment.
         """
-        return (self.start_point + 2*self.control_point + self.end_point) / 4
\ No newline at end of file
+        start, control, end = self.start_point, self.control_point, self.end_point
+        return QPointF((start.x() + 2 * control.x() + end.x()) / 4,
+                       (start.y() + 2 * control.y() + end.y()) / 4)
\ No newline at end of file